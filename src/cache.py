@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any
+
+import pandas as pd
+
+from src.utils import garantir_diretorio
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de CEPs por consulta "IN (...)", abaixo do limite
+# de parâmetros por comando de versões antigas do SQLite (999).
+_CEPS_POR_CONSULTA = 900
+
+# Validade das respostas em cache (30 dias). Endereços mudam pouco, mas
+# CEPs podem ser criados, alterados ou desativados pelos Correios.
+_VALIDADE_SEGUNDOS = 30 * 24 * 60 * 60
+
+
+def _conectar_cache(cache_folder: str) -> sqlite3.Connection:
+    """Abre o banco de cache, criando a tabela se necessário.
+
+    Args:
+        cache_folder (str): Caminho da pasta do cache.
+
+    Returns:
+        sqlite3.Connection: Conexão aberta com o banco de cache.
+    """
+    garantir_diretorio(cache_folder)
+    caminho_cache = os.path.join(cache_folder, "cep_cache.db")
+
+    conn = sqlite3.connect(caminho_cache)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cep_cache (
+            cep TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            atualizado_em REAL NOT NULL
+        );
+        """
+    )
+    return conn
+
+
+def buscar_cache(
+    ceps: list[str],
+    cache_folder: str = "data/cache/",
+) -> dict[str, dict[str, Any]]:
+    """Busca no cache local as respostas já obtidas da API ViaCEP.
+
+    Respostas gravadas há mais de 30 dias são ignoradas (e consultadas
+    novamente na API).
+
+    Args:
+        ceps (list[str]): CEPs a procurar.
+        cache_folder (str): Caminho da pasta do cache.
+            Padrão: "data/cache/".
+
+    Returns:
+        dict[str, dict[str, Any]]: Dados do endereço por CEP, apenas
+            para os CEPs encontrados no cache.
+    """
+    encontrados: dict[str, dict[str, Any]] = {}
+    limite_validade = time.time() - _VALIDADE_SEGUNDOS
+
+    try:
+        conn = _conectar_cache(cache_folder)
+        try:
+            for inicio in range(0, len(ceps), _CEPS_POR_CONSULTA):
+                lote = ceps[inicio:inicio + _CEPS_POR_CONSULTA]
+                marcadores = ", ".join("?" for _ in lote)
+                cursor = conn.execute(
+                    "SELECT cep, payload FROM cep_cache "
+                    f"WHERE cep IN ({marcadores}) AND atualizado_em >= ?;",
+                    [*lote, limite_validade],
+                )
+                for cep, payload in cursor:
+                    encontrados[cep] = json.loads(payload)
+        finally:
+            conn.close()
+
+    except (sqlite3.Error, ValueError) as e:
+        # Cache é apenas otimização: em caso de falha, consulta a API.
+        logger.warning(f"Não foi possível ler o cache de CEPs: {e}")
+        return {}
+
+    logger.info(f"Cache: {len(encontrados)} de {len(ceps)} CEP(s) encontrados.")
+    return encontrados
+
+
+def salvar_cache(
+    df_sucesso: pd.DataFrame,
+    cache_folder: str = "data/cache/",
+) -> None:
+    """Grava no cache local as respostas bem-sucedidas da API ViaCEP.
+
+    Também remove do cache as respostas que já expiraram.
+
+    Args:
+        df_sucesso (pd.DataFrame): DataFrame com registros de sucesso,
+            com colunas [cep, dados, ...].
+        cache_folder (str): Caminho da pasta do cache.
+            Padrão: "data/cache/".
+    """
+    if df_sucesso.empty:
+        return
+
+    agora = time.time()
+    linhas = (
+        (cep, json.dumps(dados, ensure_ascii=False), agora)
+        for cep, dados in zip(df_sucesso['cep'], df_sucesso['dados'])
+    )
+
+    try:
+        conn = _conectar_cache(cache_folder)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cep_cache "
+                    "(cep, payload, atualizado_em) VALUES (?, ?, ?);",
+                    linhas,
+                )
+                conn.execute(
+                    "DELETE FROM cep_cache WHERE atualizado_em < ?;",
+                    (agora - _VALIDADE_SEGUNDOS,),
+                )
+        finally:
+            conn.close()
+
+        logger.info(f"Cache: {len(df_sucesso)} CEP(s) gravados.")
+
+    except sqlite3.Error as e:
+        logger.warning(f"Não foi possível gravar o cache de CEPs: {e}")
@@ -1,9 +1,27 @@
 import logging
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Campos de endereço retornados pela API ViaCEP (mesmas colunas da
+# tabela 'enderecos', exceto o CEP).
+COLUNAS_VIACEP = [
+    'logradouro',
+    'complemento',
+    'unidade',
+    'bairro',
+    'localidade',
+    'uf',
+    'estado',
+    'regiao',
+    'ibge',
+    'gia',
+    'ddd',
+    'siafi',
+]
+
 
 def _validar_ceps_duplicados(
     df: pd.DataFrame,
@@ -20,30 +38,24 @@ def _validar_ceps_duplicados(
     Returns:
         pd.DataFrame: DataFrame sem duplicatas de CEP.
     """
-    df_processado = df.copy()
-
-    ceps_duplicados = df_processado[
-        df_processado.duplicated(subset=['cep'], keep=False)
-    ]
-
-    if len(ceps_duplicados) > 0:
-        
-        for cep, grupo in ceps_duplicados.groupby('cep'):
-            
-            colunas_comparacao = [
-                col for col in grupo.columns if col != 'cep'
-            ]
-            dados_unicos = grupo[colunas_comparacao].drop_duplicates()
-
-            if len(dados_unicos) > 1:
-                logger.warning(
-                    f"CEP {cep} possui dados inconsistentes em "
-                    f"múltiplos registros. Mantendo primeiro."
-                )
+    # CEP repetido cuja linha completa não se repete em outro registro
+    # indica dados divergentes para o mesmo CEP.
+    cep_duplicado = df.duplicated(subset=['cep'], keep=False)
+    linha_duplicada = df.duplicated(keep=False)
+    ceps_inconsistentes = df.loc[
+        cep_duplicado & ~linha_duplicada, 'cep'
+    ].unique()
+
+    if len(ceps_inconsistentes) > 0:
+        logger.warning(
+            f"{len(ceps_inconsistentes)} CEP(s) possuem dados inconsistentes "
+            f"em múltiplos registros. Mantendo primeiro: "
+            f"{', '.join(map(str, ceps_inconsistentes))}."
+        )
 
     # Remove duplicatas de CEP (mantém primeira ocorrência).
-    num_antes = len(df_processado)
-    df_processado = df_processado.drop_duplicates(
+    num_antes = len(df)
+    df_processado = df.drop_duplicates(
         subset=['cep'],
         keep='first'
     )
@@ -75,12 +87,22 @@ def validar_dados_transformados(
     Returns:
         pd.DataFrame: DataFrame validado e limpo.
     """
-    df_validado = df.copy()
-
-    df_validado = _validar_ceps_duplicados(df_validado)
-
-    # Substitui '' e espaços em branco por NaN (valor nulo).
-    df_validado = df_validado.replace(r'^\s*$', pd.NA, regex=True)
+    # As etapas abaixo retornam novos DataFrames; o df recebido não é
+    # alterado, então não é necessário copiá-lo antes.
+    df_validado = _validar_ceps_duplicados(df)
+
+    # Substitui '' e espaços em branco por NaN (valor nulo), apenas
+    # nas colunas de texto.
+    colunas_texto = df_validado.select_dtypes(
+        include=['object', 'string']
+    ).columns
+    df_validado = df_validado.assign(**{
+        col: df_validado[col].mask(
+            df_validado[col].str.strip().eq(''),
+            pd.NA,
+        )
+        for col in colunas_texto
+    })
 
     logradouro_nulo = df_validado['logradouro'].isna().sum()
 
@@ -89,14 +111,15 @@ def validar_dados_transformados(
             f"{logradouro_nulo} registro(s) com logradouro nulo."
         )
 
-    uf_invalido = df_validado[
-        (df_validado['uf'].notna()) &
-        (df_validado['uf'].str.len() != 2)
-    ]
+    # Apenas a contagem é necessária; nenhum DataFrame é filtrado.
+    uf_preenchida = df_validado['uf'].dropna()
+    uf_invalido = (
+        int(uf_preenchida.str.len().ne(2).sum()) if uf_preenchida.size else 0
+    )
 
-    if len(uf_invalido) > 0:
+    if uf_invalido > 0:
         logger.warning(
-            f"{len(uf_invalido)} registro(s) com UF inválido."
+            f"{uf_invalido} registro(s) com UF inválido."
         )
 
     return df_validado
@@ -108,7 +131,9 @@ def normalizar_resultados(
     """Normaliza DataFrame de sucessos expandindo coluna 'dados'.
 
     Expande a coluna 'dados' (que contém dicts) em múltiplas colunas
-    individuais (logradouro, bairro, localidade, uf, etc).
+    individuais (logradouro, bairro, localidade, uf, etc). Como o schema
+    da ViaCEP é conhecido, as colunas são fixas (COLUNAS_VIACEP): campos
+    ausentes viram nulos e campos extras são descartados.
 
     Args:
         df_sucesso (pd.DataFrame): DataFrame contendo apenas registros
@@ -119,14 +144,38 @@ def normalizar_resultados(
             bairro, localidade, uf, ...].
     """
     # Transformando coluna 'dados' em múltiplas colunas.
-    dados_expandidos = pd.json_normalize(df_sucesso['dados'])
+    dados_expandidos = pd.DataFrame.from_records(
+        df_sucesso['dados'].tolist(),
+        columns=COLUNAS_VIACEP,
+    )
 
-    dados_expandidos = dados_expandidos.drop(columns=['cep'], errors='ignore')
+    # Mantendo apenas CEP (limpo) e dados expandidos. As linhas estão na
+    # mesma ordem de df_sucesso, então o CEP entra como primeira coluna
+    # sem alinhamento de índices.
+    dados_expandidos.insert(0, 'cep', df_sucesso['cep'].to_numpy())
 
-    # Mantendo apenas CEP (limpo) e dados expandidos.
-    resultado = pd.concat(
-        [df_sucesso[['cep']].reset_index(drop=True), dados_expandidos],
-        axis=1
-    )
+    return dados_expandidos
+
+
+def colunas_sem_nulos(df: pd.DataFrame) -> list[np.ndarray]:
+    """Retorna as colunas do DataFrame como arrays de objetos sem nulos.
+
+    Cada coluna vira um array (cópia) com os nulos (NaN, None, pd.NA)
+    trocados por None, valor aceito pelo sqlite3 e serializado como null
+    pelo orjson. Combinar os arrays com zip(*colunas) percorre as linhas
+    sob demanda, sem cópias intermediárias do DataFrame inteiro.
 
-    return resultado
\ No newline at end of file
+    Args:
+        df (pd.DataFrame): DataFrame de origem.
+
+    Returns:
+        list[np.ndarray]: Um array por coluna, na ordem de df.columns.
+    """
+    colunas = []
+    for col in df.columns:
+        serie = df[col]
+        valores = serie.to_numpy(dtype=object, copy=True)
+        valores[serie.isna().to_numpy()] = None
+        colunas.append(valores)
+
+    return colunas
@@ -1,13 +1,52 @@
 import logging
 import os
 import sqlite3
+from typing import Any, Iterator
 
 import pandas as pd
 
+from src.data_transformation import colunas_sem_nulos
 from src.utils import garantir_diretorio
 
 logger = logging.getLogger(__name__)
 
+# Índice UNIQUE do CEP, criado após a primeira carga (ver inserir_dados).
+_INDICE_CEP = "ix_enderecos_cep"
+
+
+def _configurar_conexao(conn: sqlite3.Connection) -> None:
+    """Aplica PRAGMAs de desempenho para cargas em lote.
+
+    WAL grava as alterações em um log sequencial, e synchronous=NORMAL
+    sincroniza o disco apenas nos checkpoints (seguro em modo WAL).
+    Tabelas temporárias ficam em memória e o cache de páginas é ampliado
+    para ~64 MB.
+
+    Args:
+        conn (sqlite3.Connection): Conexão aberta com o banco.
+    """
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA cache_size=-65536;")
+
+
+def _linhas_para_insercao(
+    df: pd.DataFrame,
+) -> Iterator[tuple[Any, ...]]:
+    """Gera as linhas do DataFrame como tuplas prontas para o sqlite3.
+
+    Usa os arrays de colunas_sem_nulos (nulos viram None, pois o sqlite3
+    não aceita pd.NA) e combina as colunas linha a linha sob demanda.
+
+    Args:
+        df (pd.DataFrame): DataFrame a inserir.
+
+    Returns:
+        Iterator[tuple[Any, ...]]: Uma tupla por linha, na ordem das colunas.
+    """
+    return zip(*colunas_sem_nulos(df))
+
 
 def criar_banco(
     output_folder: str = "data/output/",
@@ -17,7 +56,8 @@ def criar_banco(
 
     Cria o arquivo base_enderecos.db e a tabela 'enderecos' com
     as colunas esperadas. Se reset=True, deleta dados existentes.
-    Caso contrário, apenas cria se não existir.
+    Caso contrário, apenas cria se não existir. A unicidade do CEP
+    é garantida por um índice criado na primeira carga de dados.
 
     Args:
         output_folder (str): Caminho da pasta para salvar o banco.
@@ -37,16 +77,27 @@ def criar_banco(
         with sqlite3.connect(caminho_db) as conn:
             cursor = conn.cursor()
 
+            # Tamanho de página e auto_vacuum só têm efeito em um arquivo
+            # novo (antes de qualquer página gravada) e precisam vir antes
+            # do modo WAL, que passa a valer para as próximas conexões.
+            cursor.execute("PRAGMA page_size=8192;")
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+            _configurar_conexao(conn)
+
             # Recria o banco se solicitado
             if reset:
                 cursor.execute("DROP TABLE IF EXISTS enderecos;")
+                # Devolve ao sistema as páginas liberadas pela tabela antiga.
+                # O pragma libera uma página por passo, e o execute() do
+                # sqlite3 executa só um; o executescript vai até o fim.
+                conn.executescript("PRAGMA incremental_vacuum;")
                 logger.info("Tabela 'enderecos' removida (reset).")
 
             cursor.execute(
                 """
                 CREATE TABLE IF NOT EXISTS enderecos (
                     id_endereco INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cep TEXT NOT NULL UNIQUE,
+                    cep TEXT NOT NULL,
                     logradouro TEXT,
                     complemento TEXT,
                     unidade TEXT,
@@ -80,9 +131,13 @@ def inserir_dados(
 ) -> None:
     """Insere dados normalizados no banco SQLite.
 
-    Insere os registros do DataFrame na tabela 'enderecos'.
-    Verifica CEPs existentes e ignora registros duplicados,
-    mantendo apenas registros novos.
+    Insere os registros do DataFrame na tabela 'enderecos' com
+    INSERT OR IGNORE: o índice UNIQUE do CEP descarta, dentro do
+    próprio SQLite, os registros cujo CEP já existe no banco.
+
+    Na primeira carga o índice ainda não existe: as linhas são inseridas
+    sem manutenção de índice, eventuais CEPs repetidos são removidos
+    (mantendo o primeiro) e o índice é construído de uma só vez.
 
     Args:
         df (pd.DataFrame): DataFrame com colunas [cep, logradouro, uf, ...].
@@ -100,42 +155,71 @@ def inserir_dados(
             f"Banco de dados não encontrado em {caminho_db}."
         )
 
+    if df.empty:
+        logger.info("Nenhum CEP novo para inserir.")
+        return
+
+    colunas = ", ".join(f'"{col}"' for col in df.columns)
+    marcadores = ", ".join("?" for _ in df.columns)
+    comando = (
+        f"INSERT OR IGNORE INTO enderecos ({colunas}) "
+        f"VALUES ({marcadores});"
+    )
+
+    linhas = _linhas_para_insercao(df)
+
     try:
-        with sqlite3.connect(caminho_db) as conn:
-            # Consulta CEPs existentes e filtra os novos
-            ceps_existentes = pd.read_sql(
-                "SELECT cep FROM enderecos",
-                conn
+        # isolation_level=None: a transação é controlada explicitamente.
+        with sqlite3.connect(caminho_db, isolation_level=None) as conn:
+            _configurar_conexao(conn)
+
+            conn.execute("BEGIN IMMEDIATE;")
+
+            try:
+                indice_existe = conn.execute(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'index' AND name = ?;",
+                    (_INDICE_CEP,),
+                ).fetchone() is not None
+
+                alteracoes_antes = conn.total_changes
+                conn.executemany(comando, linhas)
+                num_inseridos = conn.total_changes - alteracoes_antes
+
+                if not indice_existe:
+                    num_inseridos -= conn.execute(
+                        "DELETE FROM enderecos WHERE rowid NOT IN "
+                        "(SELECT MIN(rowid) FROM enderecos GROUP BY cep);"
+                    ).rowcount
+                    conn.execute(
+                        f"CREATE UNIQUE INDEX {_INDICE_CEP} "
+                        "ON enderecos (cep);"
+                    )
+
+                conn.execute("COMMIT;")
+
+            except Exception:
+                conn.execute("ROLLBACK;")
+                raise
+
+        num_duplicados = len(df) - num_inseridos
+
+        # Alerta sobre CEPs duplicados ignorados pelo banco.
+        if num_duplicados > 0:
+            logger.warning(
+                f"Aviso: {num_duplicados} CEP(s) já existem "
+                f"no banco. Foram ignorados."
+            )
+
+        if num_inseridos > 0:
+            logger.info(
+                f"Sucesso: {num_inseridos} endereço(s) "
+                "inserido(s) no banco."
             )
-            
-            df_novos = df[~df['cep'].isin(ceps_existentes['cep'])].copy()
-            num_duplicados = len(df) - len(df_novos)
-
-            # Alerta sobre CEPs duplicados e insere os novos.
-            if num_duplicados > 0:
-                logger.warning(
-                    f"Aviso: {num_duplicados} CEP(s) já existem "
-                    f"no banco. Serão ignorados."
-                )
-                
-            if len(df_novos) > 0:
-                df_novos.to_sql(
-                    name="enderecos",
-                    con=conn,
-                    if_exists="append",
-                    index=False
-                )
-
-                conn.commit()
-
-                logger.info(
-                    f"Sucesso: {len(df_novos)} endereço(s) "
-                    "inserido(s) no banco."
-                )
-                
-            else:
-                logger.info("Nenhum CEP novo para inserir.")
+
+        else:
+            logger.info("Nenhum CEP novo para inserir.")
 
     except Exception as e:
         logger.error(f"Erro ao inserir dados: {e}")
-        raise
\ No newline at end of file
+        raise
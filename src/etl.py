@@ -1,28 +1,43 @@
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from src.cache import buscar_cache, salvar_cache
 from src.data_transformation import (
     normalizar_resultados,
     validar_dados_transformados,
 )
 from src.database import criar_banco, inserir_dados
 from src.export_data import (
+    exportar_csv_erros,
     exportar_json,
     exportar_xml,
     limpar_arquivos_saida,
-    preparar_csv_erros,
 )
-from src.get_cep_info import consultar_cep
-from src.get_cep_list import carregar_lista_cep
+from src.get_cep_list import carregar_lista_cep, separar_ceps_validos
+from src.rate_limit import MAX_REQUISICOES_SIMULTANEAS
 from src.utils import garantir_diretorio
 
 logger = logging.getLogger(__name__)
 
+# Modo local com atraso simulado: o mock apenas espera (sleep), sem uso
+# de CPU. Pela relação N_threads = N_cpu * (1 + espera / processamento) o
+# limite prático é alto; 500 mantém o caráter de teste de carga do mock.
+# Sem atraso, o mock responde na hora e o trabalho é só CPU: uma thread
+# por núcleo (os.cpu_count()) basta.
+_MAX_WORKERS_LOCAL = 500
+
+# Modo API: a vazão é definida pelo rate limiting, não pela quantidade de
+# threads; uma thread por requisição em voo (ver src/rate_limit.py).
+_MAX_WORKERS_API = MAX_REQUISICOES_SIMULTANEAS
+
 
 def _validar_entrada(
     tamanho_amostra: int,
@@ -58,10 +73,125 @@ def _validar_entrada(
         )
 
 
+def _calcular_workers(
+    is_local: bool,
+    num_ceps: int,
+    simular_atraso: bool = False,
+) -> int:
+    """Define a quantidade de threads para as consultas.
+
+    Usa o limite do modo (API, mock com atraso simulado ou mock imediato),
+    sem criar mais threads do que CEPs a consultar.
+
+    Args:
+        is_local (bool): Se True, dimensiona para o mock.
+        num_ceps (int): Quantidade de CEPs a consultar.
+        simular_atraso (bool): Se True, o mock simula a espera de rede.
+            Padrão: False.
+
+    Returns:
+        int: Quantidade de workers (mínimo 1).
+    """
+    if not is_local:
+        limite = _MAX_WORKERS_API
+    elif simular_atraso:
+        limite = _MAX_WORKERS_LOCAL
+    else:
+        limite = os.cpu_count() or 1
+
+    return max(1, min(limite, num_ceps))
+
+
+def _consultar_ceps(
+    ceps: list[str],
+    consulta_fn: Callable[[str], dict[str, Any]],
+    workers: int,
+) -> pd.DataFrame:
+    """Consulta os CEPs em paralelo e monta o DataFrame de resultados.
+
+    Cada consulta é submetida ao pool de threads e, assim que fica pronta,
+    seus campos são gravados na posição original de arrays pré-alocados
+    (um por coluna). O DataFrame é criado diretamente a partir desses
+    arrays, sem lista intermediária de dicionários.
+
+    Args:
+        ceps (list[str]): CEPs a consultar.
+        consulta_fn (Callable[[str], dict[str, Any]]): Função de consulta
+            (API real ou mock).
+        workers (int): Quantidade máxima de threads simultâneas.
+
+    Returns:
+        pd.DataFrame: Resultados com colunas [cep, status, dados, mensagem],
+            na mesma ordem de `ceps`.
+    """
+    colunas = ('cep', 'status', 'dados', 'mensagem')
+    arrays = {col: np.empty(len(ceps), dtype=object) for col in colunas}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futuros = {
+            executor.submit(consulta_fn, cep): idx
+            for idx, cep in enumerate(ceps)
+        }
+
+        for futuro in tqdm(
+            as_completed(futuros),
+            total=len(ceps),
+            unit="cep",
+            desc="Progresso",
+            ncols=100  # Largura fixa para não quebrar a linha no terminal
+        ):
+            idx = futuros.pop(futuro)
+            resultado = futuro.result()
+            for col in colunas:
+                arrays[col][idx] = resultado[col]
+
+    return pd.DataFrame(arrays, copy=False)
+
+
+def _consultar_com_cache(
+    ceps: list[str],
+    consulta_fn: Callable[[str], dict[str, Any]],
+    workers: int,
+) -> pd.DataFrame:
+    """Consulta os CEPs reaproveitando respostas de execuções anteriores.
+
+    CEPs já presentes no cache local não são enviados à API (nem passam
+    pelo rate limiting). Os demais são consultados normalmente e as
+    respostas bem-sucedidas são gravadas no cache.
+
+    Args:
+        ceps (list[str]): CEPs a consultar.
+        consulta_fn (Callable[[str], dict[str, Any]]): Função de consulta
+            da API.
+        workers (int): Quantidade máxima de threads simultâneas.
+
+    Returns:
+        pd.DataFrame: Resultados com colunas [cep, status, dados, mensagem].
+    """
+    em_cache = buscar_cache(ceps)
+    pendentes = [cep for cep in ceps if cep not in em_cache]
+
+    df_consultados = _consultar_ceps(pendentes, consulta_fn, workers)
+    salvar_cache(df_consultados[df_consultados['status'] == 'sucesso'])
+
+    if not em_cache:
+        return df_consultados
+
+    df_cache = pd.DataFrame({
+        'cep': list(em_cache.keys()),
+        'status': 'sucesso',
+        'dados': list(em_cache.values()),
+        'mensagem': '',
+    })
+
+    return pd.concat([df_cache, df_consultados], ignore_index=True)
+
+
 def executar_pipeline(
     tamanho_amostra: int,
     caminho_arquivo: str = 'data/input/cep.tsv.zip',
     is_local: bool = False,
+    simular_atraso: bool = False,
 ) -> None:
     """Orquestra o fluxo completo de ETL (Extração, Transformação, Carga).
 
@@ -74,8 +204,13 @@ def executar_pipeline(
         caminho_arquivo (str): Caminho do arquivo com lista de CEPs.
             Padrão: 'data/input/cep.tsv.zip'.
         is_local (bool): Se True, usa mock ao invés de API real.
-            Define workers automaticamente: 500 em modo local, 3 em produção.
-            Padrão: False (usa API ViaCEP com 3 workers).
+            Define workers automaticamente: até 10 em produção e, em modo
+            local, um por núcleo de CPU (ou até 500 com simular_atraso),
+            sempre limitados à quantidade de CEPs.
+            Padrão: False (usa API ViaCEP).
+        simular_atraso (bool): Apenas em modo local. Se True, o mock
+            simula 0.2-1.5s de rede por CEP (teste de carga).
+            Padrão: False (mock responde na hora).
     """
     _validar_entrada(tamanho_amostra, caminho_arquivo)
 
@@ -83,8 +218,6 @@ def executar_pipeline(
     logger.info("Iniciando ETL...")
     logger.info("=" * 50)
 
-    workers = 500 if is_local else 3
-
     # Limpa/cria a pasta de saída e o banco de dados.
     # O padrão é apagar tudo para garantir que o banco
     # e os arquivos sejam recriados a cada execução.
@@ -95,46 +228,58 @@ def executar_pipeline(
     limpar_arquivos_saida("data/output/")
     criar_banco(reset=True)
 
-    modo = 'LOCAL' if is_local else 'API'
-    logger.info(
-        f"Modo {modo}. Carregando lista com {workers} worker(s)..."
-    )
     df_lista = carregar_lista_cep(
         caminho_arquivo=caminho_arquivo,
         tamanho_amostra=tamanho_amostra,
     )
-    ceps = df_lista['cep'].tolist()
+    df_validos, df_invalidos = separar_ceps_validos(df_lista)
+    ceps = df_validos['cep'].tolist()
+
+    workers = _calcular_workers(is_local, len(ceps), simular_atraso)
+    modo = 'LOCAL' if is_local else 'API'
+    logger.info(f"Modo {modo}. Lista carregada; {workers} worker(s).")
 
     logger.info(f"Iniciando consultas para {len(ceps)} CEPs...")
 
-    # Seleciona função de consulta (API real ou mock).
+    # Seleciona função de consulta (API real ou mock). Os imports ficam
+    # nos ramos para que o modo local não carregue o requests nem crie a
+    # sessão HTTP, e o modo API não dependa do pacote de testes.
     if is_local:
         from tests.test_get_cep_info import consultar_cep_mock
-        consulta_fn = consultar_cep_mock
+
+        consulta_fn = partial(consultar_cep_mock, simulate_delay=simular_atraso)
     else:
-        consulta_fn = consultar_cep
+        from src.get_cep_info import consultar_cep as consulta_fn
 
     # Execução paralela das consultas
     logger.info(f"[1/5] Consultando {len(ceps)} CEPs na API...")
     
-    resultados_brutos = []
-    with ThreadPoolExecutor(max_workers=workers) as executor:
+    if is_local:
+        df_bruto = _consultar_ceps(ceps, consulta_fn, workers)
+    else:
+        # Apenas respostas reais da API são reaproveitadas entre execuções.
+        df_bruto = _consultar_com_cache(ceps, consulta_fn, workers)
 
-        list_tqdm = tqdm(
-            executor.map(consulta_fn, ceps),
-            total=len(ceps),
-            unit="cep",
-            desc="Progresso",
-            ncols=100  # Largura fixa para não quebrar a linha no terminal
+    # CEPs rejeitados na validação de formato entram direto como erro.
+    if not df_invalidos.empty:
+        df_bruto = pd.concat(
+            [
+                df_bruto,
+                df_invalidos.assign(
+                    status='erro',
+                    dados=None,
+                    mensagem='Formato inválido.',
+                ),
+            ],
+            ignore_index=True,
         )
-        resultados_brutos = list(list_tqdm)
-    
-    df_bruto = pd.DataFrame(resultados_brutos)
     logger.info(f"[2/5] {len(df_bruto)} CEPs consultados com sucesso")
 
     logger.info("[3/5] Filtrando e transformando dados...")
-    df_sucesso = df_bruto[df_bruto['status'] == 'sucesso'].copy()
-    df_erro = df_bruto[df_bruto['status'] == 'erro'].copy()
+    # Uma única passada separa os registros por status.
+    grupos = dict(iter(df_bruto.groupby('status', sort=False)))
+    df_sucesso = grupos.get('sucesso', df_bruto.iloc[:0])
+    df_erro = grupos.get('erro', df_bruto.iloc[:0])
     logger.info(f"[3/5] Sucesso: {len(df_sucesso)} | Erros: {len(df_erro)}")
 
     if not df_sucesso.empty:
@@ -148,9 +293,6 @@ def executar_pipeline(
         exportar_xml(df_final)
 
     if not df_erro.empty:
-        logger.info(f"Gerando CSV de erros com {len(df_erro)} registro(s)...")
-        caminho_csv = "data/output/enderecos_erros.csv"
-        df_erros_formatados = preparar_csv_erros(df_erro)
-        df_erros_formatados.to_csv(caminho_csv, index=False, encoding='utf-8')
+        exportar_csv_erros(df_erro)
 
     logger.info("Pipeline finalizado com sucesso!")
\ No newline at end of file
@@ -1,13 +1,39 @@
+import gzip
+import io
 import logging
 import os
+import re
 from datetime import datetime
+from itertools import islice
+from typing import Any, Iterator
 
+import numpy as np
 import pandas as pd
 
+from src.data_transformation import colunas_sem_nulos
 from src.utils import garantir_diretorio
 
 logger = logging.getLogger(__name__)
 
+# Registros serializados por chamada ao orjson na exportação JSON.
+_REGISTROS_POR_BLOCO = 5000
+
+# Formatos aceitos por exportar_json.
+_FORMATOS_JSON = ('json', 'ndjson')
+
+# Buffer de escrita (1 MB) dos arquivos exportados.
+_BUFFER_ESCRITA = 1 << 20
+
+# Trechos das mensagens de erro que definem a categoria (ver
+# _categorizar_erros). Novas categorias entram no padrão e no mapa.
+_PADRAO_ERRO = re.compile(r'(invál|inexist|conex|http)', re.IGNORECASE)
+_CATEGORIAS_ERRO = {
+    'invál': 'CEP_INVALIDO',
+    'inexist': 'CEP_INEXISTENTE',
+    'conex': 'ERRO_CONEXAO',
+    'http': 'ERRO_CONEXAO',
+}
+
 
 def limpar_arquivo(caminho_arquivo: str) -> None:
     """Remove um arquivo individual se existir.
@@ -31,6 +57,7 @@ def limpar_arquivos_saida(output_folder: str = "data/output/") -> None:
     """
     logger.info("Limpando arquivos de saída anteriores...")
     limpar_arquivo(os.path.join(output_folder, "enderecos.json"))
+    limpar_arquivo(os.path.join(output_folder, "enderecos.ndjson.gz"))
     limpar_arquivo(os.path.join(output_folder, "enderecos.xml"))
     limpar_arquivo(os.path.join(output_folder, "enderecos_erros.csv"))
 
@@ -58,67 +85,181 @@ def preparar_csv_erros(
 
     df_limpo['data_erro'] = datetime.now().isoformat()
 
-    df_limpo['tipo_erro'] = df_limpo['mensagem'].apply(
-        _categorizar_erro
-    )
+    df_limpo['tipo_erro'] = _categorizar_erros(df_limpo['mensagem'])
 
     df_limpo = df_limpo[['cep', 'mensagem', 'tipo_erro', 'data_erro']]
 
     return df_limpo
 
 
-def _categorizar_erro(
-    mensagem: str,
-) -> str:
-    """Categoriza o tipo de erro baseado na mensagem.
+def _categorizar_erros(
+    mensagens: pd.Series,
+) -> np.ndarray:
+    """Categoriza o tipo de erro baseado nas mensagens.
+
+    Uma única expressão regular compilada (_PADRAO_ERRO) percorre toda a
+    coluna de uma vez; o primeiro trecho encontrado em cada mensagem
+    define a categoria (_CATEGORIAS_ERRO).
 
     Args:
-        mensagem (str): Mensagem de erro do resultado.
+        mensagens (pd.Series): Mensagens de erro dos resultados.
 
     Returns:
-        str: Categoria do erro (invalido, inexistente, conexao, outro).
+        np.ndarray: Categoria de cada erro (CEP_INVALIDO, CEP_INEXISTENTE,
+            ERRO_CONEXAO ou OUTRO).
     """
-    if "inválido" in mensagem.lower():
-        return "CEP_INVALIDO"
-    elif "inexistente" in mensagem.lower():
-        return "CEP_INEXISTENTE"
-    elif "conexão" in mensagem.lower() or "http" in mensagem.lower():
-        return "ERRO_CONEXAO"
-    else:
-        return "OUTRO"
+    trechos = mensagens.str.extract(_PADRAO_ERRO, expand=False)
+
+    return (
+        trechos.str.lower()
+        .map(_CATEGORIAS_ERRO)
+        .fillna('OUTRO')
+        .to_numpy(dtype=object)
+    )
+
+
+def exportar_csv_erros(
+    df_erro: pd.DataFrame,
+    output_folder: str = "data/output/",
+) -> None:
+    """Exporta os CEPs com erro em formato CSV.
+
+    Args:
+        df_erro (pd.DataFrame): DataFrame com erros
+            [cep, status, dados, mensagem].
+        output_folder (str): Caminho da pasta de saída.
+            Padrão: "data/output/".
+
+    Raises:
+        Exception: Se houver erro na exportação.
+    """
+    if df_erro.empty:
+        logger.info("Nenhum erro. Nada será exportado para CSV.")
+        return
+
+    garantir_diretorio(output_folder)
+    caminho_csv = os.path.join(output_folder, "enderecos_erros.csv")
+
+    logger.info(f"Gerando CSV de erros com {len(df_erro)} registro(s)...")
+
+    try:
+        df_erros_formatados = preparar_csv_erros(df_erro)
+        df_erros_formatados.to_csv(caminho_csv, index=False, encoding='utf-8')
+        logger.info(f"CSV: {len(df_erros_formatados)} erro(s) exportado(s).")
+    except Exception as e:
+        logger.error(f"Erro ao exportar CSV de erros: {e}")
+        raise
+
+
+def _registros_json(
+    df: pd.DataFrame,
+) -> Iterator[dict[str, Any]]:
+    """Gera as linhas do DataFrame como dicionários serializáveis em JSON.
+
+    Usa os arrays de colunas_sem_nulos (nulos viram None, que o orjson
+    serializa como null) e cria cada dicionário sob demanda.
+
+    Args:
+        df (pd.DataFrame): DataFrame a exportar.
+
+    Returns:
+        Iterator[dict[str, Any]]: Um dicionário por linha.
+    """
+    colunas = [str(col) for col in df.columns]
+    valores = colunas_sem_nulos(df)
+
+    return (dict(zip(colunas, linha)) for linha in zip(*valores))
 
 
 def exportar_json(
     df: pd.DataFrame,
     output_folder: str = "data/output/",
+    pretty: bool = False,
+    formato: str = "json",
 ) -> None:
     """Exporta DataFrame em formato JSON.
 
+    Serializa com orjson em blocos de registros, escrevendo os bytes
+    diretamente em um arquivo com buffer, sem montar o JSON inteiro
+    em memória.
+
+    Com formato="ndjson", grava um registro por linha (JSON Lines) em
+    enderecos.ndjson.gz, compactado com gzip: formato padrão de
+    ferramentas como Spark, DuckDB e jq, que podem ler o arquivo em
+    partes.
+
     Args:
         df (pd.DataFrame): DataFrame com dados normalizados.
         output_folder (str): Caminho da pasta de saída.
             Padrão: "data/output/".
+        pretty (bool): Se True, indenta o JSON (2 espaços) para leitura.
+            Ignorado no formato "ndjson".
+            Padrão: False (JSON compacto).
+        formato (str): "json" (enderecos.json, um único array) ou
+            "ndjson" (enderecos.ndjson.gz).
+            Padrão: "json".
 
     Raises:
-        Exception: Se houver erro na exportação.
+        ValueError: Se o formato não for suportado.
+        Exception: Se houver erro na exportação ou biblioteca ausente.
     """
+    if formato not in _FORMATOS_JSON:
+        raise ValueError(
+            f"formato deve ser um de {_FORMATOS_JSON}, recebido: {formato}"
+        )
+
     if df.empty:
         logger.info("DataFrame vazio. Nada será exportado para JSON.")
         return
 
     garantir_diretorio(output_folder)
-    caminho_json = os.path.join(output_folder, "enderecos.json")
     
     logger.info("Exportando dados para JSON...")
 
     try:
-        df.to_json(
-            caminho_json,
-            orient='records',
-            indent=4,
-            force_ascii=False
-        )
+        import orjson
+
+        registros = _registros_json(df)
+
+        if formato == "ndjson":
+            caminho_json = os.path.join(output_folder, "enderecos.ndjson.gz")
+
+            with io.BufferedWriter(
+                gzip.open(caminho_json, 'wb', compresslevel=3),
+                buffer_size=_BUFFER_ESCRITA,
+            ) as arquivo:
+                while bloco := list(islice(registros, _REGISTROS_POR_BLOCO)):
+                    arquivo.write(b''.join(
+                        orjson.dumps(registro, option=orjson.OPT_APPEND_NEWLINE)
+                        for registro in bloco
+                    ))
+
+        else:
+            caminho_json = os.path.join(output_folder, "enderecos.json")
+
+            with open(caminho_json, 'wb', buffering=_BUFFER_ESCRITA) as arquivo:
+                if pretty:
+                    arquivo.write(
+                        orjson.dumps(list(registros), option=orjson.OPT_INDENT_2)
+                    )
+                else:
+                    # Cada bloco é serializado como lista e gravado sem os
+                    # colchetes; o arquivo recebe um único array JSON.
+                    arquivo.write(b'[')
+                    separador = b''
+                    while bloco := list(islice(registros, _REGISTROS_POR_BLOCO)):
+                        arquivo.write(separador)
+                        arquivo.write(orjson.dumps(bloco)[1:-1])
+                        separador = b','
+                    arquivo.write(b']')
+
         logger.info(f"JSON: {len(df)} registro(s) exportado(s).")
+    except ImportError:
+        logger.error(
+            "Erro: biblioteca 'orjson' não instalada. "
+            "Execute: pip install orjson"
+        )
+        raise
     except Exception as e:
         logger.error(f"Erro ao exportar JSON: {e}")
         raise
@@ -130,6 +271,11 @@ def exportar_xml(
 ) -> None:
     """Exporta DataFrame em formato XML.
 
+    Escreve o arquivo de forma incremental (lxml.etree.xmlfile), um
+    <endereco> por linha do DataFrame, sem montar a árvore XML inteira
+    em memória. Os bytes passam por um buffer de 1 MB antes de ir para
+    o disco. Valores nulos geram elementos vazios.
+
     Args:
         df (pd.DataFrame): DataFrame com dados normalizados.
         output_folder (str): Caminho da pasta de saída.
@@ -148,13 +294,35 @@ def exportar_xml(
     logger.info("Exportando dados para XML...")
 
     try:
-        df.to_xml(
-            caminho_xml,
-            index=False,
-            root_name='enderecos',
-            row_name='endereco',
-            parser='lxml'
-        )
+        from lxml import etree
+
+        colunas = [str(col) for col in df.columns]
+
+        with open(caminho_xml, 'wb', buffering=_BUFFER_ESCRITA) as arquivo:
+            with etree.xmlfile(arquivo, encoding='utf-8') as xf:
+                xf.write_declaration()
+
+                # Quebras de linha e indentação mantêm o arquivo legível.
+                with xf.element('enderecos'):
+                    for linha in df.itertuples(index=False, name=None):
+                        xf.write('\n  ')
+
+                        with xf.element('endereco'):
+                            for coluna, valor in zip(colunas, linha):
+                                elemento = etree.Element(coluna)
+                                if not pd.isna(valor):
+                                    elemento.text = str(valor)
+
+                                xf.write('\n    ')
+                                xf.write(elemento)
+
+                            xf.write('\n  ')
+
+                    xf.write('\n')
+
+            # Quebra de linha final após </enderecos>, como no to_xml.
+            arquivo.write(b'\n')
+
         logger.info(f"XML: {len(df)} registro(s) exportado(s).")
     except ImportError:
         logger.error(
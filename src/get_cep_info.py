@@ -1,14 +1,41 @@
 import logging
+import math
+import time
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, Any, Union
 
+import orjson
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from src.rate_limit import aguardar_permissao_api
+from src.rate_limit import (
+    MAX_REQUISICOES_SIMULTANEAS,
+    aguardar_permissao_api,
+    pausar_api,
+    registrar_bloqueio_api,
+    registrar_sucesso_api,
+)
 
 logger = logging.getLogger(__name__)
 
+# Timeout (conexão, leitura) em segundos: falha rápido se o servidor não
+# aceita a conexão, mas tolera respostas lentas.
+_TIMEOUT = (3.05, 10)
+
+# Pausa máxima (segundos) aceita dos cabeçalhos da API: valores maiores
+# (ou um reset a um dia de distância) são limitados a ela, para que um
+# cabeçalho anômalo não paralise todas as threads indefinidamente.
+_PAUSA_MAXIMA = 300.0
+
+# Menor valor numérico tratado como timestamp Unix (1e9 = set/2001) por
+# _segundos_ate; valores menores são intervalos em segundos.
+_INICIO_TIMESTAMP = 1e9
+
+# Com até essa quantidade de requisições restantes na janela informada
+# pela API (X-RateLimit-Remaining), as consultas são pausadas até o reset.
+_LIMITE_RESTANTE = 2
+
 
 def _criar_sessao() -> requests.Session:
     """Cria e configura uma sessão HTTP com política de Retry e Headers.
@@ -28,12 +55,17 @@ def _criar_sessao() -> requests.Session:
         status_forcelist=[500, 502, 503, 504],
         allowed_methods=["GET"],
         raise_on_status=False,
+        backoff_jitter=0.5,  # Dessincroniza retries de threads paralelas
     )
 
+    # Todas as requisições vão para um único host (viacep.com.br): um pool,
+    # com uma conexão keep-alive por worker. Sem bloqueio: se faltar
+    # conexão no pool, uma extra é aberta em vez de travar a thread.
     adapter = HTTPAdapter(
         max_retries=retry_strategy,
-        pool_connections=10,
-        pool_maxsize=10
+        pool_connections=1,
+        pool_maxsize=MAX_REQUISICOES_SIMULTANEAS,
+        pool_block=False,
     )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
@@ -59,7 +91,66 @@ def _validar_input_cep(cep_raw: str) -> Optional[str]:
     return None
 
 
-# Sessão global reutilizável
+def _segundos_ate(valor: Optional[str]) -> Optional[float]:
+    """Converte um cabeçalho de tempo da API em segundos de espera.
+
+    Aceita segundos (ex.: "30"), timestamp Unix (ex.: X-RateLimit-Reset)
+    ou data HTTP (ex.: "Wed, 21 Oct 2015 07:28:00 GMT"). Valores não
+    finitos (ex.: "inf", "nan") são rejeitados e o resultado é limitado
+    a _PAUSA_MAXIMA.
+
+    Args:
+        valor (Optional[str]): Valor do cabeçalho.
+
+    Returns:
+        Optional[float]: Segundos de espera (entre 0 e _PAUSA_MAXIMA) ou
+            None se ausente/inválido.
+    """
+    if not valor:
+        return None
+
+    try:
+        segundos = float(valor)
+        # Timestamps Unix viram o intervalo até eles.
+        if segundos >= _INICIO_TIMESTAMP:
+            segundos -= time.time()
+    except ValueError:
+        try:
+            segundos = parsedate_to_datetime(valor).timestamp() - time.time()
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    if not math.isfinite(segundos):
+        return None
+
+    return min(max(0.0, segundos), _PAUSA_MAXIMA)
+
+
+def _respeitar_limites_api(response: requests.Response) -> None:
+    """Pausa as consultas conforme os cabeçalhos de rate limit da API.
+
+    Em um bloqueio (429), respeita o Retry-After. Se a API informar que
+    restam poucas requisições na janela atual (X-RateLimit-Remaining),
+    pausa preventivamente até o reset (X-RateLimit-Reset).
+
+    Args:
+        response (requests.Response): Resposta da API.
+    """
+    if response.status_code == 429:
+        espera = _segundos_ate(response.headers.get("Retry-After"))
+        if espera is not None:
+            pausar_api(espera)
+        return
+
+    restante = response.headers.get("X-RateLimit-Remaining")
+    if restante is not None and restante.isdigit():
+        if int(restante) <= _LIMITE_RESTANTE:
+            espera = _segundos_ate(response.headers.get("X-RateLimit-Reset"))
+            if espera is not None:
+                pausar_api(espera)
+
+
+# Sessão global reutilizável, compartilhada por todas as threads.
 session = _criar_sessao()
 
 
@@ -72,9 +163,6 @@ def consultar_cep(cep: str) -> Dict[str, Union[str, Optional[Dict[str, Any]]]]:
     Returns:
         Dict[str, Any]: Dicionário com status e dados do endereço.
     """
-    # Controle de Rate Limit (bloqueia se necessário)
-    aguardar_permissao_api()
-
     resultado = {
         "cep": cep,
         "status": "erro",
@@ -88,14 +176,23 @@ def consultar_cep(cep: str) -> Dict[str, Union[str, Optional[Dict[str, Any]]]]:
         resultado["mensagem"] = "Formato inválido."
         return resultado
 
+    # Controle de Rate Limit (bloqueia se necessário). Fica após a
+    # validação para que CEPs inválidos não consumam horários da API.
+    aguardar_permissao_api()
+
     try:
         response = session.get(
             f"https://viacep.com.br/ws/{cep_valido}/json/",
-            timeout=10,
+            timeout=_TIMEOUT,
         )
 
+        _respeitar_limites_api(response)
+
         if response.status_code == 200:
-            dados = response.json()
+            registrar_sucesso_api()
+            # Decodifica os bytes da resposta diretamente (sem passar por
+            # response.text e pela detecção de encoding do requests).
+            dados = orjson.loads(response.content)
             if "erro" in dados:
                 resultado["mensagem"] = "CEP inexistente."
             else:
@@ -104,11 +201,19 @@ def consultar_cep(cep: str) -> Dict[str, Union[str, Optional[Dict[str, Any]]]]:
 
         elif response.status_code == 429:
             resultado["mensagem"] = "Erro 429: Rate Limit da API."
-            logger.error(f"Bloqueio 429 detectado no CEP {cep}")
+            rpm = registrar_bloqueio_api()
+            logger.error(
+                f"Bloqueio 429 detectado no CEP {cep}. "
+                f"Taxa reduzida para {rpm:.1f} req/min."
+            )
 
         else:
             resultado["mensagem"] = f"Erro HTTP {response.status_code}"
 
+            # Falhas do servidor também indicam sobrecarga da API.
+            if response.status_code >= 500:
+                registrar_bloqueio_api()
+
     except Exception as e:
         resultado["mensagem"] = f"Erro de conexão: {str(e)}"
         logger.error(f"[{cep}] Exception: {e}")
@@ -1,15 +1,56 @@
+import hashlib
 import logging
 import os
 
+import numpy as np
 import pandas as pd
 
+from src.utils import garantir_diretorio
+
 logger = logging.getLogger(__name__)
 
+# Versão do formato da amostra em cache. Incremente ao mudar a leitura,
+# a deduplicação ou a amostragem: os caches antigos deixam de ser usados.
+_VERSAO_AMOSTRA = 1
+
+
+def _caminho_cache_amostra(
+    caminho_arquivo: str,
+    tamanho_amostra: int,
+    semente: int,
+    cache_folder: str,
+) -> str:
+    """Monta o caminho do cache da amostra para os parâmetros informados.
+
+    A chave combina a versão do formato da amostra (_VERSAO_AMOSTRA), o
+    arquivo de origem (caminho, data de modificação e tamanho), o tamanho
+    da amostra e a semente: qualquer alteração no arquivo, nos parâmetros
+    ou na forma de amostrar gera uma nova amostra.
+
+    Args:
+        caminho_arquivo (str): Caminho para o arquivo com a lista de CEPs.
+        tamanho_amostra (int): Número de CEPs da amostra.
+        semente (int): Semente da amostragem.
+        cache_folder (str): Caminho da pasta do cache.
+
+    Returns:
+        str: Caminho do arquivo de cache da amostra.
+    """
+    info = os.stat(caminho_arquivo)
+    chave = hashlib.sha1(
+        f"{_VERSAO_AMOSTRA}:{os.path.abspath(caminho_arquivo)}:"
+        f"{info.st_mtime_ns}:{info.st_size}:{tamanho_amostra}:{semente}"
+        .encode()
+    ).hexdigest()[:16]
+
+    return os.path.join(cache_folder, f"amostra_ceps_{chave}.pkl")
+
 
 def carregar_lista_cep(
     caminho_arquivo: str = 'data/input/cep.tsv.zip',
     tamanho_amostra: int = 10000,
-    semente: int = 25
+    semente: int = 25,
+    cache_folder: str = "data/cache/",
 ) -> pd.DataFrame:
     """Carrega e retorna uma amostra aleatória de CEPs em um DataFrame.
 
@@ -17,6 +58,9 @@ def carregar_lista_cep(
     reproduzível e retorna um DataFrame com a amostra solicitada. Caso a amostra
     solicitada exceda os dados disponíveis, emite um aviso e retorna todos os CEPs.
 
+    A amostra é guardada em cache local; execuções seguintes com o mesmo
+    arquivo e parâmetros a reaproveitam sem reler o TSV.
+
     Args:
         caminho_arquivo (str): Caminho para o arquivo com a lista de CEPs.
             Padrão: 'data/input/cep.tsv.zip'
@@ -24,6 +68,8 @@ def carregar_lista_cep(
             Padrão: 10000
         semente (int): Semente para garantir amostragem aleatória reproduzível.
             Padrão: 25
+        cache_folder (str): Caminho da pasta do cache da amostra.
+            Padrão: "data/cache/"
 
     Returns:
         pd.DataFrame: DataFrame com coluna 'cep' contendo os CEPs da amostra.
@@ -37,17 +83,73 @@ def carregar_lista_cep(
     if not os.path.exists(caminho_arquivo):
         raise FileNotFoundError(f"Arquivo não encontrado: {caminho_arquivo}")
 
+    caminho_cache = _caminho_cache_amostra(
+        caminho_arquivo, tamanho_amostra, semente, cache_folder
+    )
+    try:
+        cep_df = pd.read_pickle(caminho_cache)
+        logger.info(f"Amostra carregada do cache: {caminho_cache}")
+        return cep_df
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # Cache corrompido ou incompatível: a amostra é refeita.
+        logger.warning(f"Não foi possível ler o cache da amostra: {e}")
+
+    cep_df = _amostrar_ceps(caminho_arquivo, tamanho_amostra, semente)
+
+    try:
+        garantir_diretorio(cache_folder)
+        cep_df.to_pickle(caminho_cache)
+    except OSError as e:
+        logger.warning(f"Não foi possível gravar o cache da amostra: {e}")
+
+    return cep_df
+
+
+def _amostrar_ceps(
+    caminho_arquivo: str,
+    tamanho_amostra: int,
+    semente: int,
+) -> pd.DataFrame:
+    """Lê o arquivo de CEPs e sorteia a amostra.
+
+    Args:
+        caminho_arquivo (str): Caminho para o arquivo com a lista de CEPs.
+        tamanho_amostra (int): Número de CEPs a serem retornados na amostra.
+        semente (int): Semente para garantir amostragem aleatória reproduzível.
+
+    Returns:
+        pd.DataFrame: DataFrame com coluna 'cep' contendo os CEPs da amostra.
+
+    Raises:
+        RuntimeError: Se houver erro ao carregar o arquivo TSV (ex: formato inválido).
+    """
     try:
         # O arquivo é um TSV (table separated values), por isso o separador é '\t'.
         # Puxei apenas a coluna 'cep' para economizar memória.
         # Mantive o tipo str para evitar problemas com zeros à esquerda.
+        # Sem detecção de nulos (na_filter): o CEP é sempre lido como texto
+        # e valores vazios são rejeitados depois, na validação de formato.
         cep_df = pd.read_csv(
             caminho_arquivo,
             sep='\t',
             usecols=['cep'],
             dtype={'cep': str},
+            engine='c',
+            na_filter=False,
         )
 
+        # CEPs repetidos no arquivo custariam uma consulta (e um horário
+        # do rate limiting) a mais cada; apenas a primeira ocorrência fica.
+        total_lido = len(cep_df)
+        cep_df = cep_df.drop_duplicates('cep', ignore_index=True)
+        if len(cep_df) < total_lido:
+            logger.warning(
+                f"{total_lido - len(cep_df)} CEP(s) duplicado(s) "
+                "removido(s) da lista antes da amostragem."
+            )
+
         if len(cep_df) < tamanho_amostra:
             logger.warning(
                 f"Amostra solicitada ({tamanho_amostra}) "
@@ -57,13 +159,54 @@ def carregar_lista_cep(
             return cep_df.reset_index(drop=True)
 
         # Limitando os resultados à amostra desejada (10.000 casos).
-        # O random_state garante que a amostra seja a mesma em execuções
+        # A semente garante que a amostra seja a mesma em execuções
         # diferentes. A escolha do 25 por padrão foi por causa da soma dos
         # dígitos do ano de fundação do banco (1 + 9 + 6 + 9 = 25).
-        return cep_df.sample(
-            n=tamanho_amostra,
-            random_state=semente,
-        ).reset_index(drop=True)
+        # Sorteia apenas as posições e copia só as linhas escolhidas,
+        # sem embaralhar nem copiar o DataFrame inteiro. As posições são
+        # ordenadas para que a cópia percorra o array em sequência.
+        posicoes = np.random.default_rng(semente).choice(
+            len(cep_df),
+            size=tamanho_amostra,
+            replace=False,
+            shuffle=False,
+        )
+        posicoes.sort()
+        return pd.DataFrame({'cep': cep_df['cep'].to_numpy()[posicoes]})
 
     except Exception as e:
-        raise RuntimeError(f"Erro ao carregar CEPs: {e}")
\ No newline at end of file
+        raise RuntimeError(f"Erro ao carregar CEPs: {e}")
+
+
+def separar_ceps_validos(
+    cep_df: pd.DataFrame,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Separa os CEPs com formato válido dos inválidos.
+
+    Remove hífens, pontos e espaços de toda a coluna de uma vez e
+    mantém como válidos apenas os CEPs com exatamente 8 dígitos.
+    Assim, CEPs inválidos não chegam a ser consultados (nem ocupam
+    espaço no rate limiting da API).
+
+    Args:
+        cep_df (pd.DataFrame): DataFrame com a coluna 'cep'.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: CEPs válidos (já higienizados)
+            e CEPs inválidos (como lidos do arquivo), ambos com a coluna 'cep'.
+    """
+    cep_limpo = cep_df['cep'].str.replace(r'[-.]', '', regex=True).str.strip()
+    mascara_valida = cep_limpo.str.fullmatch(r'\d{8}', na=False)
+
+    df_validos = pd.DataFrame(
+        {'cep': cep_limpo[mascara_valida]}
+    ).reset_index(drop=True)
+    df_invalidos = cep_df.loc[~mascara_valida, ['cep']].reset_index(drop=True)
+
+    if not df_invalidos.empty:
+        logger.warning(
+            f"{len(df_invalidos)} CEP(s) com formato inválido "
+            "não serão consultados."
+        )
+
+    return df_validos, df_invalidos
@@ -5,25 +5,122 @@ from threading import Lock
 # NUNCA passaremos de ~57 requisições por minuto (margem de segurança).
 _INTERVALO_MINIMO = 1.05
 
-_ultimo_acesso = 0.0
+# Requisições à API em voo ao mesmo tempo: define tanto os workers do modo
+# API (src/etl.py) quanto o pool de conexões keep-alive da sessão HTTP
+# (src/get_cep_info.py). A vazão vem do intervalo acima, não das threads;
+# com timeout de 10s, ceil(10 / 1.05) = 10 requisições em voo evitam que
+# o limite fique ocioso enquanto outras aguardam resposta.
+MAX_REQUISICOES_SIMULTANEAS = 10
+
+# Controle adaptativo AIMD (aumento aditivo, redução multiplicativa) da
+# taxa, em requisições por minuto. Começa no teto seguro (~57 req/min),
+# cai pela metade a cada bloqueio da API e volta a subir aos poucos a
+# cada resposta bem-sucedida.
+_RPM_MAXIMO = 60.0 / _INTERVALO_MINIMO
+_RPM_MINIMO = 10.0
+_AUMENTO_RPM = 0.5
+_FATOR_REDUCAO = 0.5
+
+_rpm_atual = _RPM_MAXIMO
+
+# Próximo horário (time.monotonic) livre para uma requisição.
+_proximo_horario = 0.0
+
+# Fim (time.monotonic) da pausa pedida pela API (ver pausar_api).
+_pausado_ate = 0.0
+
+# Horário (time.monotonic) da última requisição liberada e geração das
+# reservas: cada redução da taxa inicia uma nova geração, e os horários
+# reservados em gerações anteriores são refeitos com o novo espaçamento.
+_ultima_liberacao = 0.0
+_geracao = 0
 _lock = Lock()
 
 
 def aguardar_permissao_api() -> None:
     """Bloqueia a execução atual até que seja seguro fazer uma nova requisição.
 
-    Implementa uma lógica de espaçamento temporal mínimo. Se uma requisição
-    tentar ocorrer muito perto da anterior, esta função coloca a thread atual
-    para dormir pelo tempo restante necessário.
+    Implementa uma lógica de espaçamento temporal mínimo por reserva de
+    horários: cada chamada reserva o próximo horário livre (espaçado de
+    60 / _rpm_atual segundos do anterior) e dorme até ele. O lock protege
+    apenas a reserva; a espera acontece fora dele, sem bloquear as demais
+    threads.
+
+    Ao acordar, o horário é revalidado: se a API pediu uma pausa depois
+    da reserva (pausar_api) e ela ainda não terminou, ou se a taxa foi
+    reduzida depois da reserva (registrar_bloqueio_api), um novo horário
+    é reservado, após a pausa e com o novo espaçamento.
     """
-    global _ultimo_acesso
+    global _proximo_horario, _ultima_liberacao
 
     with _lock:
         agora = time.monotonic()
-        tempo_desde_ultimo = agora - _ultimo_acesso
+        horario_reservado = max(agora, _proximo_horario)
+        _proximo_horario = horario_reservado + 60.0 / _rpm_atual
+        geracao_reserva = _geracao
 
-        if tempo_desde_ultimo < _INTERVALO_MINIMO:
-            tempo_espera = _INTERVALO_MINIMO - tempo_desde_ultimo
+    while True:
+        tempo_espera = horario_reservado - agora
+        if tempo_espera > 0:
             time.sleep(tempo_espera)
 
-        _ultimo_acesso = time.monotonic()
\ No newline at end of file
+        with _lock:
+            agora = time.monotonic()
+            if agora >= _pausado_ate and geracao_reserva == _geracao:
+                _ultima_liberacao = agora
+                return
+
+            horario_reservado = max(agora, _pausado_ate, _proximo_horario)
+            _proximo_horario = horario_reservado + 60.0 / _rpm_atual
+            geracao_reserva = _geracao
+
+
+def registrar_sucesso_api() -> None:
+    """Aumenta a taxa permitida após uma resposta bem-sucedida da API.
+
+    Aumento aditivo de _AUMENTO_RPM, limitado a _RPM_MAXIMO.
+    """
+    global _rpm_atual
+
+    with _lock:
+        _rpm_atual = min(_RPM_MAXIMO, _rpm_atual + _AUMENTO_RPM)
+
+
+def registrar_bloqueio_api() -> float:
+    """Reduz a taxa permitida após um bloqueio (429) ou falha (5xx) da API.
+
+    Redução multiplicativa por _FATOR_REDUCAO, limitada a _RPM_MINIMO.
+    Os próximos horários passam a contar da última requisição liberada,
+    com o novo espaçamento; os já reservados são refeitos pelas threads
+    ao acordar (ver aguardar_permissao_api).
+
+    Returns:
+        float: Nova taxa permitida, em requisições por minuto.
+    """
+    global _rpm_atual, _proximo_horario, _geracao
+
+    with _lock:
+        _rpm_atual = max(_RPM_MINIMO, _rpm_atual * _FATOR_REDUCAO)
+        _proximo_horario = max(
+            _pausado_ate, _ultima_liberacao + 60.0 / _rpm_atual
+        )
+        _geracao += 1
+        return _rpm_atual
+
+
+def pausar_api(segundos: float) -> None:
+    """Suspende novas requisições por um período determinado pela API.
+
+    Adia o próximo horário livre para, no mínimo, `segundos` a partir de
+    agora (ex.: cabeçalho Retry-After). Threads que já reservaram um
+    horário dentro da pausa reservam outro ao acordar (ver
+    aguardar_permissao_api).
+
+    Args:
+        segundos (float): Tempo de pausa, em segundos.
+    """
+    global _proximo_horario, _pausado_ate
+
+    with _lock:
+        _pausado_ate = max(_pausado_ate, time.monotonic() + segundos)
+        _proximo_horario = max(_proximo_horario, _pausado_ate)
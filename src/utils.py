@@ -1,82 +1,321 @@
+import atexit
 import logging
+import logging.config
+import logging.handlers
 import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Diretórios já garantidos nesta execução (caminhos normalizados): as
+# chamadas seguintes para o mesmo caminho não acessam o sistema de arquivos.
+_diretorios_garantidos: set[str] = set()
+
+# Buffer (64 KB) do arquivo de log: várias linhas por escrita em disco.
+_BUFFER_LOG = 1 << 16
+
+# Intervalo (segundos) entre as gravações periódicas do lote de logs em disco.
+_INTERVALO_GRAVACAO_LOG = 0.5
+
+# Formato detalhado para arquivo
+_FORMATO_ARQUIVO = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# Formato conciso para console
+_FORMATO_CONSOLE = logging.Formatter(
+    '%(levelname)s: %(message)s'
+)
+
+# Thread que grava os registros de log enfileirados (ver configurar_logging).
+_listener: logging.handlers.QueueListener | None = None
+
+# Indica se configurar_logging já foi executada neste processo.
+_configurado = False
 
 
 def garantir_diretorio(caminho: str) -> None:
     """Garante que o diretório especificado exista.
 
-    Verifica a existência do caminho informado e, caso não exista,
-    cria a estrutura de pastas necessária.
+    Tenta criar a estrutura de pastas diretamente, sem consultar antes
+    se ela existe (uma chamada de sistema a menos e sem condição de
+    corrida entre a verificação e a criação). Só registra log quando
+    o diretório é de fato criado. Cada caminho é verificado uma única
+    vez por execução.
 
     Args:
         caminho (str): Caminho da pasta a ser verificada/criada.
+
+    Raises:
+        FileExistsError: Se o caminho já existe, mas não é um diretório.
+    """
+    caminho_normalizado = os.path.normpath(caminho)
+    if caminho_normalizado in _diretorios_garantidos:
+        return
+
+    try:
+        os.makedirs(caminho_normalizado)
+        logger.info("Diretório preparado: %s", caminho)
+    except FileExistsError:
+        # Só é verificado quando algo já existe no caminho: um arquivo
+        # com o mesmo nome faria as gravações seguintes falharem.
+        if not os.path.isdir(caminho_normalizado):
+            raise
+
+    _diretorios_garantidos.add(caminho_normalizado)
+
+
+class _ArquivoLogBufferizado(logging.FileHandler):
+    """FileHandler que acumula as linhas em um buffer de 64 KB.
+
+    O arquivo só é aberto no primeiro registro (delay=True) e o buffer só
+    é descarregado no disco quando enche, em registros de nível ERROR ou
+    superior e no fechamento do handler, em vez de a cada registro.
+    """
+
+    def __init__(self, caminho_log: str) -> None:
+        super().__init__(caminho_log, encoding='utf-8', delay=True)
+
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=_BUFFER_LOG,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.ERROR:
+                self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _LoteLogTemporizado(logging.handlers.MemoryHandler):
+    """MemoryHandler que grava o lote também por tempo, não só por tamanho.
+
+    Além dos gatilhos do MemoryHandler (lote cheio ou registro de nível
+    flushLevel), uma thread em segundo plano grava o lote a cada
+    `intervalo` segundos, descarregando também o buffer do arquivo de
+    destino. Em execuções longas com pouco log (modo API), o arquivo fica
+    no máximo `intervalo` segundos atrás dos eventos.
     """
-    logger = logging.getLogger(__name__)
-    if not os.path.exists(caminho):
-        os.makedirs(caminho)
-        logger.info(f"Diretório preparado: {caminho}")
+
+    def __init__(
+        self,
+        capacity: int,
+        flushLevel: int,
+        target: logging.Handler,
+        intervalo: float,
+    ) -> None:
+        super().__init__(
+            capacity,
+            flushLevel=flushLevel,
+            target=target,
+            flushOnClose=True,
+        )
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._gravar_periodicamente,
+            name="gravacao-periodica-log",
+            daemon=True,
+        )
+
+    def iniciar(self) -> None:
+        """Inicia a thread de gravação periódica."""
+        self._thread.start()
+
+    def _gravar_periodicamente(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            # Sem registros pendentes, o destino também não tem o que gravar.
+            if not self.buffer:
+                return
+            super().flush()
+            if self.target is not None:
+                self.target.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        super().close()
 
 
 def _limpar_log_anterior(caminho_log: str) -> None:
     """Remove o arquivo de log anterior para iniciar uma nova sessão limpa.
 
-    Verifica se o arquivo de log existe e o remove, evitando logs
+    Remove o arquivo de log diretamente, se existir, evitando logs
     acumulados de execuções anteriores.
 
     Args:
         caminho_log (str): Caminho completo do arquivo de log a limpar.
     """
-    logger = logging.getLogger(__name__)
-    if os.path.exists(caminho_log):
-        try:
-            os.remove(caminho_log)
-            logger.info(f"Log anterior removido: {caminho_log}")
-        except OSError as e:
-            logger.warning(f"Não foi possível remover log anterior: {e}")
+    try:
+        os.remove(caminho_log)
+        logger.info("Log anterior removido: %s", caminho_log)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Não foi possível remover log anterior: %s", e)
+
+
+def _parar_listener() -> None:
+    """Grava os registros ainda na fila e encerra a thread de log, se ativa.
+
+    Também fecha os handlers do listener: o buffer em memória do arquivo
+    (MemoryHandler) é gravado no destino antes de o arquivo ser fechado.
+    """
+    global _listener
+
+    if _listener is None:
+        return
+
+    _listener.stop()
+    for handler in _listener.handlers:
+        destino = getattr(handler, 'target', None)
+        handler.close()
+        if destino is not None:
+            destino.close()
 
+    _listener = None
 
-def configurar_logging() -> None:
+
+# Registrado após o import do logging: ao sair do Python, roda antes do
+# logging.shutdown, que então grava o que restou em memória no arquivo.
+atexit.register(_parar_listener)
+
+
+def _criar_handler_fila(
+    caminho_log: str,
+    exibir_console: bool,
+) -> logging.handlers.QueueHandler:
+    """Cria o handler do logger raiz e a thread que grava os registros.
+
+    Usada como fábrica ("()") pelo dictConfig em configurar_logging.
+    Monta os handlers de arquivo (em lote) e de console, entrega-os a um
+    QueueListener e devolve o QueueHandler que alimenta a fila.
+
+    Args:
+        caminho_log (str): Caminho completo do arquivo de log.
+        exibir_console (bool): Se True, inclui o handler de console.
+
+    Returns:
+        logging.handlers.QueueHandler: Handler a instalar no logger raiz.
+    """
+    global _listener
+
+    # Handler para geração de ARQUIVO (todos os níveis de logs)
+    arquivo_destino = _ArquivoLogBufferizado(caminho_log)
+    arquivo_destino.setFormatter(_FORMATO_ARQUIVO)
+
+    # Acumula registros em memória e grava em lote no arquivo (lote de 512
+    # cheio ou a cada 0.5s), em vez de uma escrita por registro. Erros
+    # forçam a gravação imediata; o restante é gravado no encerramento.
+    arquivo_handler = _LoteLogTemporizado(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=arquivo_destino,
+        intervalo=_INTERVALO_GRAVACAO_LOG,
+    )
+    arquivo_handler.setLevel(logging.DEBUG)
+    # A thread periódica é encerrada em _parar_listener (close do handler).
+    arquivo_handler.iniciar()
+
+    handlers = [arquivo_handler]
+
+    # Handler para o CONSOLE (apenas logs de nível ERROR e CRITICAL)
+    if exibir_console:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.ERROR)
+        console_handler.setFormatter(_FORMATO_CONSOLE)
+        handlers.append(console_handler)
+
+    # O logger raiz só enfileira; os handlers rodam na thread do listener.
+    fila_logs = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        fila_logs,
+        *handlers,
+        respect_handler_level=True,
+    )
+    _listener.start()
+
+    return logging.handlers.QueueHandler(fila_logs)
+
+
+def configurar_logging(exibir_console: bool = True) -> None:
     """Centraliza a configuração de log do sistema.
 
     Configura dois handlers:
     - Console: exibe apenas ERROR e CRITICAL (erros graves)
     - Arquivo: registra todos os eventos com detalhes em data/output/pipeline_diagnosis.log
-    """
-    logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)  # Captura tudo internamente
 
-    # Remove handlers anteriores (se houver)
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
+    Os handlers não ficam no logger raiz: ele apenas enfileira os
+    registros (QueueHandler), e uma thread em segundo plano
+    (QueueListener) aplica os formatos de arquivo e console e faz a
+    escrita. Quem chama logger.info() ainda monta a mensagem (argumentos
+    e traceback, em QueueHandler.prepare), mas não espera pela gravação
+    em disco.
 
-    caminho_log = "data/output/pipeline_diagnosis.log"
-    _limpar_log_anterior(caminho_log)
+    Toda a árvore de loggers (raiz e bibliotecas externas) é configurada
+    em uma única chamada a logging.config.dictConfig, que também fecha e
+    remove handlers instalados anteriormente.
 
-    # Formato detalhado para arquivo
-    formato_arquivo = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    A configuração é feita uma única vez por processo; chamadas seguintes
+    não fazem nada (nem reabrem ou apagam o arquivo de log).
 
-    # Formato conciso para console
-    formato_console = logging.Formatter(
-        '%(levelname)s: %(message)s'
-    )
+    Args:
+        exibir_console (bool): Se False, não instala o handler de console
+            (ex.: testes ou execuções com stderr capturado); os erros
+            continuam registrados no arquivo.
+            Padrão: True.
+    """
+    global _configurado
 
-    # Handler para geração de ARQUIVO (todos os níveis de logs)
+    if _configurado:
+        return
+
+    caminho_log = "data/output/pipeline_diagnosis.log"
+    _limpar_log_anterior(caminho_log)
     garantir_diretorio("data/output/")
-    arquivo_handler = logging.FileHandler(caminho_log, encoding='utf-8')
-    arquivo_handler.setLevel(logging.DEBUG)
-    arquivo_handler.setFormatter(formato_arquivo)
-    logger.addHandler(arquivo_handler)
 
-    # Handler para o CONSOLE (apenas logs de nível ERROR e CRITICAL)
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.ERROR)
-    console_handler.setFormatter(formato_console)
-    logger.addHandler(console_handler)
-
-    # Silencia logs verbose das bibliotecas externas
-    # urllib3 gera muitas mensagens de retry que poluem o console
-    logging.getLogger('urllib3').setLevel(logging.CRITICAL)
-    logging.getLogger('requests').setLevel(logging.WARNING)
\ No newline at end of file
+    logging.config.dictConfig({
+        'version': 1,
+        # Mantém ativos os loggers dos módulos já importados (src.*).
+        'disable_existing_loggers': False,
+        'handlers': {
+            'fila': {
+                '()': _criar_handler_fila,
+                'caminho_log': caminho_log,
+                'exibir_console': exibir_console,
+            },
+        },
+        'root': {
+            'level': 'DEBUG',  # Captura tudo internamente
+            'handlers': ['fila'],
+        },
+        # Silencia logs verbose das bibliotecas externas
+        # urllib3 gera muitas mensagens de retry que poluem o console
+        'loggers': {
+            'urllib3': {'level': 'CRITICAL'},
+            'requests': {'level': 'WARNING'},
+        },
+    })
+
+    _configurado = True
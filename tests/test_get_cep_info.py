@@ -1,42 +1,93 @@
-import random
 import time
-from typing import Any
+from collections import deque
+from threading import Lock
+from typing import Any, Callable
 
+import numpy as np
 
-def consultar_cep_mock(cep: str) -> dict[str, Any]:
+# Sorteios gerados de uma vez pelo NumPy (em lotes) e consumidos um a um
+# pelas chamadas do mock, em vez de uma chamada ao random por sorteio.
+_TAMANHO_LOTE = 8192
+_gerador = np.random.default_rng()
+_sorteios_sucesso: deque[bool] = deque()  # Já comparados com 0.8
+_sorteios_atraso: deque[float] = deque()
+_lock = Lock()  # O gerador do NumPy não é thread-safe
+
+# Respostas fixas do mock (sem o CEP), montadas uma única vez. O dicionário
+# "dados" é compartilhado entre os resultados: não deve ser alterado.
+_RESULTADO_SUCESSO = {
+    "status": "sucesso",
+    "dados": {
+        "logradouro": "Rua Fictícia",
+        "bairro": "Bairro Fictício",
+        "localidade": "Cidade Fictícia",
+        "uf": "SP",
+    },
+    "mensagem": "",
+}
+_RESULTADO_ERRO = {
+    "status": "erro",
+    "dados": None,
+    "mensagem": "CEP inválido ou inexistente.",
+}
+
+
+def _proximo_sorteio(
+    fila: deque[Any],
+    gerar_lote: Callable[[], np.ndarray],
+) -> Any:
+    """Retira o próximo sorteio da fila, gerando um novo lote se vazia.
+
+    Args:
+        fila (deque[Any]): Fila de sorteios pré-gerados.
+        gerar_lote (Callable[[], np.ndarray]): Gera um novo lote de sorteios.
+
+    Returns:
+        Any: Próximo valor sorteado.
+    """
+    while True:
+        try:
+            return fila.popleft()
+        except IndexError:
+            with _lock:
+                if not fila:
+                    fila.extend(gerar_lote().tolist())
+
+
+def consultar_cep_mock(
+    cep: str,
+    *,
+    simulate_delay: bool = False,
+) -> dict[str, Any]:
     """Mock da função consultar_cep para testes.
 
-    Simula o comportamento da API ViaCEP com delay aleatório.
+    Simula o comportamento da API ViaCEP, opcionalmente com delay aleatório.
     80% de sucesso, 20% de erro para testar tratamento de falhas.
 
     Args:
         cep (str): CEP a ser consultado.
+        simulate_delay (bool): Se True, espera de 0.2 a 1.5s para simular
+            o tempo de rede (útil para testes de carga).
+            Padrão: False (resposta imediata).
 
     Returns:
         dict[str, Any]: Resultado simulado com status e dados.
     """
-    # Simula o tempo de rede (delay aleatório)
-    time.sleep(random.uniform(0.2, 1.5))
+    # Simula o tempo de rede (delay aleatório), apenas se solicitado
+    if simulate_delay:
+        time.sleep(_proximo_sorteio(
+            _sorteios_atraso,
+            lambda: _gerador.uniform(0.2, 1.5, size=_TAMANHO_LOTE),
+        ))
 
     # 80% de chance de sucesso e
     # 20% de chance de erro 
     # (para testar tratamento de erros).
-    if random.random() <= 0.8:
-        return {
-            "cep": cep,
-            "status": "sucesso",
-            "dados": {
-                "logradouro": "Rua Fictícia",
-                "bairro": "Bairro Fictício",
-                "localidade": "Cidade Fictícia",
-                "uf": "SP",
-            },
-            "mensagem": "",
-        }
-
-    return {
-        "cep": cep,
-        "status": "erro",
-        "dados": None,
-        "mensagem": "CEP inválido ou inexistente.",
-    }
\ No newline at end of file
+    # A comparação é feita no lote inteiro, de uma vez, pelo NumPy.
+    if _proximo_sorteio(
+        _sorteios_sucesso,
+        lambda: _gerador.random(size=_TAMANHO_LOTE) <= 0.8,
+    ):
+        return {"cep": cep, **_RESULTADO_SUCESSO}
+
+    return {"cep": cep, **_RESULTADO_ERRO}
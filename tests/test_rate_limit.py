@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from src import rate_limit
+
+
+@pytest.fixture
+def limitador(monkeypatch):
+    """Limitador zerado, com 0.1s entre requisições (600 req/min)."""
+    monkeypatch.setattr(rate_limit, "_rpm_atual", 600.0)
+    monkeypatch.setattr(rate_limit, "_proximo_horario", 0.0)
+    monkeypatch.setattr(rate_limit, "_pausado_ate", 0.0)
+    monkeypatch.setattr(rate_limit, "_ultima_liberacao", 0.0)
+    monkeypatch.setattr(rate_limit, "_geracao", 0)
+    return rate_limit
+
+
+def _disparar_concorrentes(quantidade, acao, atraso):
+    """Libera `quantidade` threads em aguardar_permissao_api ao mesmo tempo.
+
+    Executa `acao` `atraso` segundos após a largada e retorna o horário
+    (time.monotonic) da ação e os horários em que cada thread foi liberada.
+    """
+    barreira = threading.Barrier(quantidade + 1)
+    liberacoes = []
+    lock = threading.Lock()
+
+    def worker():
+        barreira.wait()
+        rate_limit.aguardar_permissao_api()
+        with lock:
+            liberacoes.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(quantidade)]
+    for thread in threads:
+        thread.start()
+
+    barreira.wait()
+    time.sleep(atraso)
+    momento_acao = time.monotonic()
+    acao()
+
+    for thread in threads:
+        thread.join()
+
+    return momento_acao, sorted(liberacoes)
+
+
+def test_pausa_vale_para_horarios_ja_reservados(limitador):
+    momento_pausa, liberacoes = _disparar_concorrentes(
+        10, lambda: limitador.pausar_api(0.5), atraso=0.05
+    )
+
+    # Só a primeira requisição sai antes da pausa.
+    assert liberacoes[0] < momento_pausa
+    assert all(t >= momento_pausa + 0.5 for t in liberacoes[1:])
+
+
+def test_bloqueio_reespaca_horarios_ja_reservados(limitador):
+    def bloqueio():
+        # Um 429: taxa reduzida pela metade (0.2s) e Retry-After de 0.3s.
+        limitador.registrar_bloqueio_api()
+        limitador.pausar_api(0.3)
+
+    momento_bloqueio, liberacoes = _disparar_concorrentes(
+        10, bloqueio, atraso=0.05
+    )
+
+    assert liberacoes[0] < momento_bloqueio
+    assert all(t >= momento_bloqueio + 0.3 for t in liberacoes[1:])
+    intervalos = [b - a for a, b in zip(liberacoes[1:], liberacoes[2:])]
+    assert min(intervalos) >= 0.19
@@ -0,0 +1,37 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from src.get_cep_info import _PAUSA_MAXIMA, _segundos_ate
+
+
+def test_segundos_ate_intervalo_em_segundos():
+    assert _segundos_ate("30") == 30.0
+    assert _segundos_ate("-5") == 0.0
+
+
+def test_segundos_ate_timestamp_unix():
+    espera = _segundos_ate(str(time.time() + 60))
+    assert 55 <= espera <= 60
+
+
+def test_segundos_ate_data_http():
+    espera = _segundos_ate(formatdate(time.time() + 60, usegmt=True))
+    assert 55 <= espera <= 60
+
+
+@pytest.mark.parametrize("valor", [None, "", "abc", "30s"])
+def test_segundos_ate_valor_invalido(valor):
+    assert _segundos_ate(valor) is None
+
+
+@pytest.mark.parametrize("valor", ["inf", "-inf", "nan", "1e400"])
+def test_segundos_ate_valor_nao_finito(valor):
+    assert _segundos_ate(valor) is None
+
+
+def test_segundos_ate_limitado_a_pausa_maxima():
+    assert _segundos_ate("1e300") == _PAUSA_MAXIMA
+    assert _segundos_ate("100000") == _PAUSA_MAXIMA
+    assert _segundos_ate(str(time.time() + 86_400)) == _PAUSA_MAXIMA